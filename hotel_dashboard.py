@@ -12,105 +12,159 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import requests
 import io
 import zipfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from statsmodels.tsa.seasonal import seasonal_decompose
 import numpy as np
 
+REGION_COLORS = {'Marne': '#1f77b4', 'France': '#ff7f0e'}
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
 st.set_page_config(
     page_title="Hotel Frequency Dashboard",
     page_icon="🏨",
     layout="wide"
 )
 
-def load_insee_data(url, region_name, max_retries=3, delay=2):
-    """Load and process INSEE CSV data from ZIP archive with retry logic"""
+def fetch_insee_archive(url, session=None):
+    """Download an INSEE ZIP archive into a seekable in-memory buffer"""
+    if session is not None:
+        http = session
+    else:
+        import requests
+        http = requests
+    # Fail fast on unreachable hosts while allowing slow archive transfers
+    with http.get(url, timeout=(5, 30), stream=True) as response:
+        response.raise_for_status()
+        # Copy the body in chunks instead of keeping requests' own copy as well;
+        # iter_content (unlike response.raw) reports truncated transfers as
+        # RequestExceptions, so they are retried
+        archive = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            archive.write(chunk)
+    archive.seek(0)
+    return archive
+
+def parse_insee_archive(archive, region_name):
+    """Extract and clean the data CSV from an INSEE ZIP archive file object"""
+    # Extract CSV from ZIP
+    with zipfile.ZipFile(archive) as zip_file:
+        # Look for CSV files in the ZIP
+        csv_files = [f for f in zip_file.namelist() if f.endswith('.csv')]
+
+        if not csv_files:
+            # Runs in a worker thread, where st.error would be dropped; the
+            # message is reported by main() instead
+            raise ValueError("no CSV files found in the archive")
+
+        # Read the main data file (usually valeurs_mensuelles.csv)
+        data_file = [f for f in csv_files if 'valeurs' in f.lower() or 'donnees' in f.lower()]
+        if not data_file:
+            data_file = csv_files[0]  # Take first CSV if no specific data file found
+        else:
+            data_file = data_file[0]
+
+        # Set proper column names based on the format: date, value, status
+        if "Hotels" in region_name:
+            value_col = 'Hotel_Count'
+        elif "Nights" in region_name:
+            value_col = 'Hotel_Nights'
+        else:
+            value_col = 'Occupancy_Rate'
+
+        with zip_file.open(data_file) as csv_file:
+            # Skip first 4 lines; the C parser strips the quotes
+            df = pd.read_csv(csv_file, sep=';', skiprows=4, header=None,
+                             usecols=[0, 1, 2], names=['Date', value_col, 'Status'],
+                             dtype={'Date': str, value_col: str, 'Status': 'category'},
+                             encoding='utf-8', encoding_errors='replace')
+
+        # Convert decimal commas; placeholders such as "nd" become NaN and are dropped below
+        df[value_col] = pd.to_numeric(df[value_col].str.replace(',', '.', regex=False), errors='coerce')
+
+        # Try monthly format first (YYYY-MM), then annual format (YYYY)
+        date_str = df['Date']
+        df['Date'] = pd.to_datetime(date_str, format='%Y-%m', errors='coerce')
+        # If all dates failed (annual data), try yearly format
+        if df['Date'].isna().all():
+            df['Date'] = pd.to_datetime(date_str, format='%Y', errors='coerce')
+
+        # Filter out rows with invalid dates or values
+        df = df.dropna(subset=['Date', value_col])
+
+        # Monthly and annual periods need no sub-second precision
+        df['Date'] = df['Date'].astype('datetime64[s]')
+
+        # Guard against repeated periods skewing averages and endpoint metrics
+        df = df.drop_duplicates('Date', keep='last')
+
+        # Sort by date, keeping a compact RangeIndex; INSEE files are newest-first,
+        # which a stable (run-detecting) sort reverses in linear time
+        df = df.sort_values('Date', kind='stable', ignore_index=True)
+
+        # Add region identifier
+        df['Region'] = region_name
+        return df
+
+@st.cache_data(persist="disk", show_spinner=False)
+def stored_insee_series(series_path, region_name, _series=None):
+    """Last good (fetch date, frame) of an INSEE series, persisted on disk"""
+    # Returns None on a miss; _series is only passed to replace the entry after clearing it
+    return _series
+
+def load_insee_data(url, region_name, max_retries=3, delay=2, session=None):
+    """Load and process INSEE CSV data from ZIP archive with retry logic
+
+    Returns (df, error): df is None when loading failed, and error is a
+    message for the user when the downloaded archive could not be read.
+    """
+    import requests
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    # Key the stored entry on the series path: the query's end period changes monthly
+    series_path = url.split('?', 1)[0]
+    stored = stored_insee_series(series_path, region_name)
+    if stored is not None and stored[0] == today:
+        return stored[1], None
+    # Served when the daily refresh fails, so an outage never loses the last good data
+    stale_df = stored[1] if stored is not None else None
+
     for attempt in range(max_retries):
-        try:
-            # Add delay between requests to avoid overwhelming the server
-            if attempt > 0:
-                time.sleep(delay * attempt)  # Exponential backoff
-
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            # Extract CSV from ZIP
-            with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
-                # Look for CSV files in the ZIP
-                csv_files = [f for f in zip_file.namelist() if f.endswith('.csv')]
-
-                if not csv_files:
-                    st.error(f"No CSV files found in {region_name} data")
-                    return None
-
-                # Read the main data file (usually valeurs_mensuelles.csv)
-                data_file = [f for f in csv_files if 'valeurs' in f.lower() or 'donnees' in f.lower()]
-                if not data_file:
-                    data_file = csv_files[0]  # Take first CSV if no specific data file found
-                else:
-                    data_file = data_file[0]
+        # Add delay between requests to avoid overwhelming the server
+        if attempt > 0:
+            time.sleep(delay * attempt)  # Exponential backoff
 
-                with zip_file.open(data_file) as csv_file:
-                    # Try different encodings and skip first 4 lines
-                    try:
-                        df = pd.read_csv(csv_file, encoding='utf-8', sep=';', skiprows=4, header=None)
-                    except UnicodeDecodeError:
-                        csv_file.seek(0)
-                        df = pd.read_csv(csv_file, encoding='latin-1', sep=';', skiprows=4, header=None)
-
-                    # Set proper column names based on the format: date, value, status
-                    if len(df.columns) >= 3:
-                        if "Hotels" in region_name:
-                            df.columns = ['Date', 'Hotel_Count', 'Status'] + [f'Col_{i}' for i in range(3, len(df.columns))]
-                            value_col = 'Hotel_Count'
-                        elif "Nights" in region_name:
-                            df.columns = ['Date', 'Hotel_Nights', 'Status'] + [f'Col_{i}' for i in range(3, len(df.columns))]
-                            value_col = 'Hotel_Nights'
-                        else:
-                            df.columns = ['Date', 'Occupancy_Rate', 'Status'] + [f'Col_{i}' for i in range(3, len(df.columns))]
-                            value_col = 'Occupancy_Rate'
-
-                        # Clean the data
-                        # Remove quotes from value and convert to float
-                        df[value_col] = df[value_col].astype(str).str.replace('"', '').str.replace(',', '.').astype(float)
-
-                        # Clean the date column and convert to datetime
-                        df['Date'] = df['Date'].astype(str).str.replace('"', '')
-                        # Try monthly format first (YYYY-MM), then annual format (YYYY)
-                        date_str = df['Date'].copy()
-                        df['Date'] = pd.to_datetime(date_str, format='%Y-%m', errors='coerce')
-                        # If all dates failed (annual data), try yearly format
-                        if df['Date'].isna().all():
-                            df['Date'] = pd.to_datetime(date_str, format='%Y', errors='coerce')
-
-                        # Clean status column
-                        df['Status'] = df['Status'].astype(str).str.replace('"', '')
-
-                        # Filter out rows with invalid dates or values
-                        df = df.dropna(subset=['Date', value_col])
-
-                        # Sort by date
-                        df = df.sort_values('Date')
-
-                    # Add region identifier
-                    df['Region'] = region_name
-                    return df
-
-        except Exception as e:
-            if attempt == max_retries - 1:  # Last attempt
-                # Only show error on final failure, no warnings during retries
-                # st.error(f"Error loading data for {region_name} after {max_retries} attempts: {str(e)}")
-                return None
-            # Don't show warnings for retry attempts - they clutter the UI
-
-    return None
-
-@st.cache_data
+        try:
+            df = parse_insee_archive(fetch_insee_archive(url, session=session), region_name)
+        except (requests.RequestException, zipfile.BadZipFile):
+            # Network failures and truncated downloads are retried; no warnings
+            # during retries - they clutter the UI
+            continue
+        except ValueError as exc:
+            # Malformed archive or CSV (pandas parser errors are ValueErrors; bad
+            # bytes are replaced on decoding): retrying would only parse the same bytes again
+            return stale_df, f"Could not read {region_name} data: {exc}"
+
+        # Replace the stored entry in place only once the refresh has succeeded
+        stored_insee_series.clear(series_path, region_name)
+        stored_insee_series(series_path, region_name, _series=(today, df))
+        return df, None
+
+    return stale_df, None
+
+@st.cache_resource(ttl=86400, show_spinner=False)
 def get_hotel_data():
-    """Fetch and combine hotel frequency data"""
+    """Fetch and combine hotel frequency data
+
+    Cached as a shared resource so reruns get the same frames without a
+    per-call copy; callers must treat them as read-only. Returns the frames
+    and the load error messages, which the caller reports since the loads
+    run in worker threads.
+    """
     current_year = datetime.now().year
     current_month = datetime.now().month
 
@@ -131,48 +185,120 @@ def get_hotel_data():
     grand_est_nights_4_5_stars_url = "https://bdm.insee.fr/series/010606763/csv?lang=fr&ordre=antechronologique&transposition=donneescolonne&periodeDebut=1&anneeDebut=2011&periodeFin=1&anneeFin=2024&revision=sansrevisions"
     grand_est_nights_non_rated_url = "https://bdm.insee.fr/series/010606811/csv?lang=fr&ordre=antechronologique&transposition=donneescolonne&periodeDebut=1&anneeDebut=2011&periodeFin=1&anneeFin=2024&revision=sansrevisions"
 
-    marne_data = load_insee_data(marne_url, "Marne")
-    time.sleep(1)  # Delay between requests
-
-    france_data = load_insee_data(france_url, "France")
-    time.sleep(1)  # Delay between requests
-
-    grand_est_hotels_data = load_insee_data(grand_est_hotels_url, "Grand Est Hotels")
-    time.sleep(1)  # Delay between requests
-
-    marne_nights_total_data = load_insee_data(marne_nights_total_url, "Marne Nights Total")
-    time.sleep(1)  # Delay between requests
-
-    marne_nights_residents_data = load_insee_data(marne_nights_residents_url, "Marne Nights Residents")
-    time.sleep(1)  # Delay between requests
-
-    marne_nights_nonresidents_data = load_insee_data(marne_nights_nonresidents_url, "Marne Nights NonResidents")
-    time.sleep(1)  # Delay between requests
-
-    france_nights_total_data = load_insee_data(france_nights_total_url, "France Nights Total")
-    time.sleep(1)  # Delay between requests
-
-    france_nights_residents_data = load_insee_data(france_nights_residents_url, "France Nights Residents")
-    time.sleep(1)  # Delay between requests
-
-    france_nights_nonresidents_data = load_insee_data(france_nights_nonresidents_url, "France Nights NonResidents")
-    time.sleep(1)  # Delay between requests
-
-    grand_est_nights_total_data = load_insee_data(grand_est_nights_total_url, "Grand Est Nights Total")
-    time.sleep(1)  # Delay between requests
-
-    grand_est_nights_1_2_stars_data = load_insee_data(grand_est_nights_1_2_stars_url, "Grand Est Nights 1-2 Stars")
-    time.sleep(1)  # Delay between requests
-
-    grand_est_nights_3_stars_data = load_insee_data(grand_est_nights_3_stars_url, "Grand Est Nights 3 Stars")
-    time.sleep(1)  # Delay between requests
-
-    grand_est_nights_4_5_stars_data = load_insee_data(grand_est_nights_4_5_stars_url, "Grand Est Nights 4-5 Stars")
-    time.sleep(1)  # Delay between requests
+    sources = [
+        (marne_url, "Marne"),
+        (france_url, "France"),
+        (grand_est_hotels_url, "Grand Est Hotels"),
+        (marne_nights_total_url, "Marne Nights Total"),
+        (marne_nights_residents_url, "Marne Nights Residents"),
+        (marne_nights_nonresidents_url, "Marne Nights NonResidents"),
+        (france_nights_total_url, "France Nights Total"),
+        (france_nights_residents_url, "France Nights Residents"),
+        (france_nights_nonresidents_url, "France Nights NonResidents"),
+        (grand_est_nights_total_url, "Grand Est Nights Total"),
+        (grand_est_nights_1_2_stars_url, "Grand Est Nights 1-2 Stars"),
+        (grand_est_nights_3_stars_url, "Grand Est Nights 3 Stars"),
+        (grand_est_nights_4_5_stars_url, "Grand Est Nights 4-5 Stars"),
+        (grand_est_nights_non_rated_url, "Grand Est Nights Non-Rated"),
+    ]
+
+    # requests is only needed on a cache miss, so import it here
+    import requests
+
+    # Fetch concurrently over a shared session so connections are reused;
+    # keep the pool small to avoid overwhelming the INSEE server
+    with requests.Session() as session:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda source: load_insee_data(source[0], source[1], session=session), sources))
+
+    frames = tuple(df for df, _ in results)
+    errors = tuple(error for _, error in results if error)
+    return frames, errors
+
+@st.cache_data(show_spinner=False)
+def decompose_series(ts_data, period=12):
+    """Additive seasonal decomposition, cached so reruns reuse the result
+
+    Vectorized equivalent of statsmodels' seasonal_decompose(model='additive'):
+    centered moving-average trend, per-position mean of the detrended values as
+    the seasonal component. Columns are accessed like its result (.trend, .seasonal).
+    """
+    values = ts_data.to_numpy(dtype=float)
+
+    # Centered moving average; even periods use half weights at both ends
+    if period % 2 == 0:
+        weights = np.r_[0.5, np.ones(period - 1), 0.5] / period
+    else:
+        weights = np.ones(period) / period
+    half = len(weights) // 2
+    trend = np.full(len(values), np.nan)
+    trend[half:len(values) - half] = np.convolve(values, weights, mode='valid')
+
+    # Average detrended values per position in the cycle, centered on zero
+    detrended = values - trend
+    padded = np.full(-(-len(values) // period) * period, np.nan)
+    padded[:len(values)] = detrended
+    period_averages = np.nanmean(padded.reshape(-1, period), axis=0)
+    period_averages -= period_averages.mean()
+    seasonal = np.resize(period_averages, len(values))
+
+    return pd.DataFrame({
+        'observed': values,
+        'trend': trend,
+        'seasonal': seasonal,
+        'resid': detrended - seasonal
+    }, index=ts_data.index)
+
+def prepare_ts(df, value_col):
+    """Regularize a series to monthly frequency and decompose it"""
+    ts_data = df.set_index('Date')[value_col].dropna()
+    ts_data = ts_data.asfreq('MS')
+    ts_data = ts_data.interpolate(method='linear')
+    ts_data = ts_data.fillna(ts_data.mean())
+
+    if len(ts_data) <= 24:
+        return None, None
+    return ts_data, decompose_series(ts_data)
+
+@st.cache_data(show_spinner=False)
+def build_monthly(df, value_col):
+    """Average values per (month, year) for the monthly distribution charts"""
+    # Attach the grouping keys to the value column only, rather than copying the frame
+    monthly = (df[[value_col]]
+               .assign(Month=df['Date'].dt.month.astype('int8'),
+                       Year=df['Date'].dt.year.astype('int16'))
+               .groupby(['Month', 'Year'])[value_col].mean()
+               .reset_index())
+    monthly['Month_Name'] = monthly['Month'].map(dict(enumerate(MONTHS, start=1)))
+    return monthly
+
+def monthly_box_figure(monthly, value_col, color, title, y_label, y_range=None):
+    """Box plot of a value across years, one box per calendar month"""
+    fig = px.box(monthly,
+                 x='Month_Name',
+                 y=value_col,
+                 category_orders={'Month_Name': MONTHS},
+                 color_discrete_sequence=[color])
+    fig.update_traces(boxmean=True)
+
+    layout_update = dict(
+        title=title,
+        xaxis_title="",
+        yaxis_title=y_label,
+        height=320,
+        margin=dict(t=50, b=40, l=40, r=40)
+    )
+    if y_range is not None:
+        layout_update['yaxis'] = dict(range=y_range)
 
-    grand_est_nights_non_rated_data = load_insee_data(grand_est_nights_non_rated_url, "Grand Est Nights Non-Rated")
+    fig.update_layout(**layout_update)
+    return fig
 
-    return marne_data, france_data, grand_est_hotels_data, marne_nights_total_data, marne_nights_residents_data, marne_nights_nonresidents_data, france_nights_total_data, france_nights_residents_data, france_nights_nonresidents_data, grand_est_nights_total_data, grand_est_nights_1_2_stars_data, grand_est_nights_3_stars_data, grand_est_nights_4_5_stars_data, grand_est_nights_non_rated_data
+def share_of_total(part_df, total_df, value_col='Hotel_Nights'):
+    """Percentage of the total at each of the total's dates, matched on Date"""
+    total = total_df.set_index('Date')[value_col]
+    part = part_df.set_index('Date')[value_col].reindex(total.index)
+    return (part / total * 100).to_numpy()
 
 def process_data(df):
     """Process and clean the data - data is already processed in load_insee_data"""
@@ -188,7 +314,11 @@ def main():
 
     # Load data
     with st.spinner("Loading hotel frequency data..."):
-        marne_data, france_data, grand_est_hotels_data, marne_nights_total_data, marne_nights_residents_data, marne_nights_nonresidents_data, france_nights_total_data, france_nights_residents_data, france_nights_nonresidents_data, grand_est_nights_total_data, grand_est_nights_1_2_stars_data, grand_est_nights_3_stars_data, grand_est_nights_4_5_stars_data, grand_est_nights_non_rated_data = get_hotel_data()
+        frames, load_errors = get_hotel_data()
+    marne_data, france_data, grand_est_hotels_data, marne_nights_total_data, marne_nights_residents_data, marne_nights_nonresidents_data, france_nights_total_data, france_nights_residents_data, france_nights_nonresidents_data, grand_est_nights_total_data, grand_est_nights_1_2_stars_data, grand_est_nights_3_stars_data, grand_est_nights_4_5_stars_data, grand_est_nights_non_rated_data = frames
+
+    for message in load_errors:
+        st.error(message)
 
     if all(data is None for data in [marne_data, france_data, grand_est_hotels_data, marne_nights_total_data, marne_nights_residents_data, marne_nights_nonresidents_data, france_nights_total_data, france_nights_residents_data, france_nights_nonresidents_data, grand_est_nights_total_data, grand_est_nights_1_2_stars_data, grand_est_nights_3_stars_data, grand_est_nights_4_5_stars_data, grand_est_nights_non_rated_data]):
         st.error("Failed to load data from all sources. Please check the URLs and try again.")
@@ -293,83 +423,60 @@ def main():
         default=available_sources
     )
 
+    # Summary statistics (mean, min, max) computed once and reused by every chart
+    region_stats = {}
+    for name, df, value_col in [("Marne", marne_processed, 'Occupancy_Rate'),
+                                ("France", france_processed, 'Occupancy_Rate'),
+                                ("Grand Est", grand_est_hotels_processed, 'Hotel_Count')]:
+        if df is not None and value_col in df.columns:
+            values = df[value_col]
+            region_stats[name] = (values.mean(), values.min(), values.max())
+
+    # Shared occupancy y-axis range when both regions are displayed
+    shared_occupancy_range = None
+    if ("Marne" in selected_regions and "France" in selected_regions and
+            "Marne" in region_stats and "France" in region_stats):
+        all_min = min(region_stats["Marne"][1], region_stats["France"][1])
+        all_max = max(region_stats["Marne"][2], region_stats["France"][2])
+        shared_occupancy_range = [all_min - 2, all_max + 2]
+
     # Main content area - focus on visualizations
     # st.header("📈 Hotel Frequency Trends")
 
     # Individual region charts
     col1, col2 = st.columns(2)
 
-    with col1:
-        if "Marne" in selected_regions and marne_processed is not None:
-            # st.subheader("📍 Marne")
-
-            # Create visualization using the cleaned data
-            if 'Date' in marne_processed.columns and 'Occupancy_Rate' in marne_processed.columns:
-                avg_val = marne_processed['Occupancy_Rate'].mean()
-
-                fig = px.line(marne_processed,
-                             x='Date',
-                             y='Occupancy_Rate',
-                             title="Marne Hotel Occupancy Rate (%)",
-                             color_discrete_sequence=['#1f77b4'])
+    for column, region_name, region_processed in [(col1, "Marne", marne_processed), (col2, "France", france_processed)]:
+        with column:
+            if region_name in selected_regions and region_processed is not None:
+                # Create visualization using the cleaned data
+                if 'Date' in region_processed.columns and 'Occupancy_Rate' in region_processed.columns:
+                    avg_val = region_stats[region_name][0]
 
-                # Add horizontal average line
-                fig.add_hline(y=avg_val, line_dash="dash", line_color="red",
-                             annotation_text=f"Avg: {avg_val:.1f}%",
-                             annotation_position="top right")
+                    fig = px.line(region_processed,
+                                 x='Date',
+                                 y='Occupancy_Rate',
+                                 title=f"{region_name} Hotel Occupancy Rate (%)",
+                                 color_discrete_sequence=[REGION_COLORS[region_name]])
 
-                # Get y-axis range for shared scaling
-                if "France" in selected_regions and france_processed is not None:
-                    france_avg = france_processed['Occupancy_Rate'].mean()
-                    all_min = min(marne_processed['Occupancy_Rate'].min(), france_processed['Occupancy_Rate'].min())
-                    all_max = max(marne_processed['Occupancy_Rate'].max(), france_processed['Occupancy_Rate'].max())
-                    fig.update_layout(yaxis=dict(range=[all_min - 2, all_max + 2]))
+                    # Add horizontal average line
+                    fig.add_hline(y=avg_val, line_dash="dash", line_color="red",
+                                 annotation_text=f"Avg: {avg_val:.1f}%",
+                                 annotation_position="top right")
 
-                fig.update_layout(
-                    height=350,
-                    xaxis_title="",
-                    yaxis_title="Occupancy Rate (%)",
-                    margin=dict(t=40, b=40, l=40, r=40)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.error("Required columns (Date, Occupancy_Rate) not found in Marne data")
-
-    with col2:
-        if "France" in selected_regions and france_processed is not None:
-            # st.subheader("🇫🇷 France")
-
-            # Create visualization using the cleaned data
-            if 'Date' in france_processed.columns and 'Occupancy_Rate' in france_processed.columns:
-                avg_val = france_processed['Occupancy_Rate'].mean()
-
-                fig = px.line(france_processed,
-                             x='Date',
-                             y='Occupancy_Rate',
-                             title="France Hotel Occupancy Rate (%)",
-                             color_discrete_sequence=['#ff7f0e'])
-
-                # Add horizontal average line
-                fig.add_hline(y=avg_val, line_dash="dash", line_color="red",
-                             annotation_text=f"Avg: {avg_val:.1f}%",
-                             annotation_position="top right")
-
-                # Set shared y-axis range if both regions are selected
-                if "Marne" in selected_regions and marne_processed is not None:
-                    marne_avg = marne_processed['Occupancy_Rate'].mean()
-                    all_min = min(marne_processed['Occupancy_Rate'].min(), france_processed['Occupancy_Rate'].min())
-                    all_max = max(marne_processed['Occupancy_Rate'].max(), france_processed['Occupancy_Rate'].max())
-                    fig.update_layout(yaxis=dict(range=[all_min - 2, all_max + 2]))
+                    # Set shared y-axis range if both regions are selected
+                    if shared_occupancy_range is not None:
+                        fig.update_layout(yaxis=dict(range=shared_occupancy_range))
 
-                fig.update_layout(
-                    height=350,
-                    xaxis_title="",
-                    yaxis_title="Occupancy Rate (%)",
-                    margin=dict(t=40, b=40, l=40, r=40)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.error("Required columns (Date, Occupancy_Rate) not found in France data")
+                    fig.update_layout(
+                        height=350,
+                        xaxis_title="",
+                        yaxis_title="Occupancy Rate (%)",
+                        margin=dict(t=40, b=40, l=40, r=40)
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.error(f"Required columns (Date, Occupancy_Rate) not found in {region_name} data")
 
     # Comparison section if both datasets are available
     if len(selected_regions) > 1 and marne_processed is not None and france_processed is not None:
@@ -381,25 +488,16 @@ def main():
 
             fig = go.Figure()
 
-            # Add Marne data
-            fig.add_trace(go.Scatter(
-                x=marne_processed['Date'],
-                y=marne_processed['Occupancy_Rate'],
-                mode='lines+markers',
-                name='Marne',
-                line=dict(color='#1f77b4', width=3),
-                marker=dict(size=4)
-            ))
-
-            # Add France data
-            fig.add_trace(go.Scatter(
-                x=france_processed['Date'],
-                y=france_processed['Occupancy_Rate'],
-                mode='lines+markers',
-                name='France',
-                line=dict(color='#ff7f0e', width=3),
-                marker=dict(size=4)
-            ))
+            # Add one trace per region
+            for region_name, region_processed in [("Marne", marne_processed), ("France", france_processed)]:
+                fig.add_trace(go.Scattergl(
+                    x=region_processed['Date'],
+                    y=region_processed['Occupancy_Rate'],
+                    mode='lines+markers',
+                    name=region_name,
+                    line=dict(color=REGION_COLORS[region_name], width=3),
+                    marker=dict(size=4)
+                ))
 
             fig.update_layout(
                 title="Hotel Occupancy Rate Comparison: Marne vs France",
@@ -421,8 +519,8 @@ def main():
             # Add comparison metrics
             col1, col2, col3 = st.columns(3)
 
-            marne_avg = marne_processed['Occupancy_Rate'].mean()
-            france_avg = france_processed['Occupancy_Rate'].mean()
+            marne_avg = region_stats["Marne"][0]
+            france_avg = region_stats["France"][0]
             ratio = (marne_avg / france_avg * 100) if france_avg != 0 else 0
 
             with col1:
@@ -438,981 +536,658 @@ def main():
     # Seasonal Decomposition Analysis
     # st.header("📈 Trend & Seasonal Analysis")
 
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Seasonal Decomposition", "Monthly Patterns", "Marne Hotel Nights", "France Hotel Nights", "Grand Est by Rating", "Grand Est Hotels Count"])
+    # Rerun on tab switch so only the selected tab's charts are computed
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Seasonal Decomposition", "Monthly Patterns", "Marne Hotel Nights", "France Hotel Nights", "Grand Est by Rating", "Grand Est Hotels Count"],
+                                                 key="analysis_tab", on_change="rerun")
 
     with tab1:
-        st.subheader(f"Seasonal Decomposition - {analysis_type}")
+        if tab1.open:
+            st.subheader(f"Seasonal Decomposition - {analysis_type}")
+
+            # Share the original data y-axis range for occupancy rates if both regions are selected
+            shared_y_range_original = None
+            if analysis_type == "Occupancy Rate (%)":
+                shared_y_range_original = shared_occupancy_range
 
-        # Determine which data to use based on analysis type
-        def get_analysis_data(region_processed, nights_processed, analysis_type):
-            if analysis_type == "Hotel Nights":
-                return nights_processed, 'Hotel_Nights', 'Hotel Nights'
-            else:
-                return region_processed, 'Occupancy_Rate', 'Occupancy Rate (%)'
-
-        # Calculate shared y-axis range for occupancy rates if both regions are selected
-        shared_y_range_original = None
-        shared_y_range_seasonal = None
-
-        if analysis_type == "Occupancy Rate (%)" and "Marne" in selected_regions and "France" in selected_regions:
-            if marne_processed is not None and france_processed is not None:
-                # For original data and trend
-                marne_min = marne_processed['Occupancy_Rate'].min()
-                marne_max = marne_processed['Occupancy_Rate'].max()
-                france_min = france_processed['Occupancy_Rate'].min()
-                france_max = france_processed['Occupancy_Rate'].max()
-                all_min = min(marne_min, france_min)
-                all_max = max(marne_max, france_max)
-                shared_y_range_original = [all_min - 2, all_max + 2]
-
-                # For seasonal component - will be calculated after decomposition
-                # We'll store the seasonal component ranges and calculate later
-
-        # Store decomposition results for shared y-axis calculation
-        marne_decomposition = None
-        france_decomposition = None
-        marne_ts_data = None
-        france_ts_data = None
-
-        # First pass: compute decompositions
-        if "Marne" in selected_regions:
             if analysis_type == "Hotel Nights":
-                data_source = marne_nights_total_processed
                 value_col = 'Hotel_Nights'
+                y_label = 'Hotel Nights (thousands)'
             else:
-                data_source = marne_processed
                 value_col = 'Occupancy_Rate'
+                y_label = 'Occupancy Rate (%)'
+
+            # First pass: compute each selected region's series and decomposition once
+            decompositions = {}
+            for region_name, region_processed, nights_processed in [
+                    ("Marne", marne_processed, marne_nights_total_processed),
+                    ("France", france_processed, france_nights_total_processed)]:
+                if region_name not in selected_regions:
+                    continue
+
+                data_source = nights_processed if analysis_type == "Hotel Nights" else region_processed
+                if data_source is not None and len(data_source) > 24:
+                    try:
+                        ts_data, decomposition = prepare_ts(data_source, value_col)
+                    except (KeyError, ValueError):
+                        # Irregular or incomplete series: report decomposition as unavailable
+                        continue
+                    if decomposition is not None:
+                        decompositions[region_name] = (ts_data, decomposition)
+
+            # Second pass: shared seasonal y-axis range for occupancy rates
+            shared_y_range_seasonal = None
+            if analysis_type == "Occupancy Rate (%)" and len(decompositions) == 2:
+                seasonal_min = min(decomposition.seasonal.values.min() for _, decomposition in decompositions.values())
+                seasonal_max = max(decomposition.seasonal.values.max() for _, decomposition in decompositions.values())
+                shared_y_range_seasonal = [seasonal_min - 0.5, seasonal_max + 0.5]
+
+            # Third pass: display charts with shared y-axis
+            col1, col2 = st.columns(2)
 
-            if data_source is not None and len(data_source) > 24:
-                try:
-                    ts_data = data_source.set_index('Date')[value_col].dropna()
-                    ts_data = ts_data.asfreq('MS')
-                    ts_data = ts_data.interpolate(method='linear')
-                    ts_data = ts_data.fillna(ts_data.mean())
+            for column, region_name in [(col1, "Marne"), (col2, "France")]:
+                with column:
+                    if region_name in decompositions:
+                        ts_data, decomposition = decompositions[region_name]
 
-                    if len(ts_data) > 24:
-                        marne_decomposition = seasonal_decompose(ts_data, model='additive', period=12)
-                        marne_ts_data = ts_data
-                except:
-                    pass
+                        st.subheader(f"{region_name} - Seasonal Decomposition")
 
-        if "France" in selected_regions:
+                        # Original data and trend
+                        fig = go.Figure()
+                        fig.add_trace(go.Scattergl(
+                            x=ts_data.index, y=ts_data.values,
+                            mode='lines', name='Original',
+                            line=dict(color=REGION_COLORS[region_name])
+                        ))
+                        fig.add_trace(go.Scattergl(
+                            x=decomposition.trend.index, y=decomposition.trend.values,
+                            mode='lines', name='Trend',
+                            line=dict(color='red', width=2)
+                        ))
+
+                        layout_update = dict(
+                            title=f"{region_name}: Original Data & Trend ({analysis_type})",
+                            height=320,
+                            xaxis_title="",
+                            yaxis_title=y_label,
+                            margin=dict(t=50, b=30, l=40, r=40)
+                        )
+                        if shared_y_range_original is not None:
+                            layout_update['yaxis'] = dict(range=shared_y_range_original)
+
+                        fig.update_layout(**layout_update)
+                        st.plotly_chart(fig, use_container_width=True)
+
+                        # Seasonal component
+                        fig_seasonal = px.line(
+                            x=decomposition.seasonal.index,
+                            y=decomposition.seasonal.values,
+                            title=f"{region_name} - Seasonal Component"
+                        )
+                        seasonal_layout = dict(
+                            height=250,
+                            margin=dict(t=40, b=30, l=40, r=40)
+                        )
+                        if shared_y_range_seasonal is not None:
+                            seasonal_layout['yaxis'] = dict(range=shared_y_range_seasonal)
+
+                        fig_seasonal.update_layout(**seasonal_layout)
+                        st.plotly_chart(fig_seasonal, use_container_width=True)
+                    elif region_name in selected_regions:
+                        st.info(f"Seasonal decomposition not available for {region_name}")
+
+    with tab2:
+        if tab2.open:
+            st.subheader(f"Monthly Patterns Across Years - {analysis_type}")
+
+            # Pick the series matching the selected analysis type
             if analysis_type == "Hotel Nights":
-                data_source = france_nights_total_processed
                 value_col = 'Hotel_Nights'
+                y_label = 'Hotel Nights (thousands)'
+                title_suffix = "Monthly Hotel Nights Distribution"
             else:
-                data_source = france_processed
                 value_col = 'Occupancy_Rate'
+                y_label = 'Occupancy Rate (%)'
+                title_suffix = "Monthly Occupancy Distribution"
+
+            # First pass: build each selected region's monthly values once
+            monthly_by_region = {}
+            for region_name, region_processed, nights_processed in [
+                    ("Marne", marne_processed, marne_nights_total_processed),
+                    ("France", france_processed, france_nights_total_processed)]:
+                data_source = nights_processed if analysis_type == "Hotel Nights" else region_processed
+                if region_name in selected_regions and data_source is not None:
+                    monthly_by_region[region_name] = build_monthly(data_source, value_col)
+
+            # Second pass: share the y-axis range for side-by-side occupancy rates
+            y_range = None
+            if analysis_type == "Occupancy Rate (%)" and len(monthly_by_region) == 2:
+                combined_min = min(monthly[value_col].min() for monthly in monthly_by_region.values())
+                combined_max = max(monthly[value_col].max() for monthly in monthly_by_region.values())
+                y_range = [combined_min - 2, combined_max + 2]
+
+            # Third pass: one chart per region, side by side when both are shown
+            if monthly_by_region:
+                columns = st.columns(len(monthly_by_region))
+                for column, (region_name, monthly) in zip(columns, monthly_by_region.items()):
+                    with column:
+                        fig = monthly_box_figure(monthly, value_col, REGION_COLORS[region_name],
+                                                 f"{region_name} - {title_suffix}", y_label, y_range)
+                        st.plotly_chart(fig, use_container_width=True)
 
-            if data_source is not None and len(data_source) > 24:
-                try:
-                    ts_data = data_source.set_index('Date')[value_col].dropna()
-                    ts_data = ts_data.asfreq('MS')
-                    ts_data = ts_data.interpolate(method='linear')
-                    ts_data = ts_data.fillna(ts_data.mean())
-
-                    if len(ts_data) > 24:
-                        france_decomposition = seasonal_decompose(ts_data, model='additive', period=12)
-                        france_ts_data = ts_data
-                except:
-                    pass
-
-        # Calculate shared seasonal y-axis range for occupancy rates
-        shared_y_range_seasonal = None
-        if analysis_type == "Occupancy Rate (%)" and marne_decomposition is not None and france_decomposition is not None:
-            marne_seasonal_min = marne_decomposition.seasonal.values.min()
-            marne_seasonal_max = marne_decomposition.seasonal.values.max()
-            france_seasonal_min = france_decomposition.seasonal.values.min()
-            france_seasonal_max = france_decomposition.seasonal.values.max()
-            seasonal_min = min(marne_seasonal_min, france_seasonal_min)
-            seasonal_max = max(marne_seasonal_max, france_seasonal_max)
-            shared_y_range_seasonal = [seasonal_min - 0.5, seasonal_max + 0.5]
-
-        # Second pass: display charts with shared y-axis
-        col1, col2 = st.columns(2)
-
-        with col1:
-            if "Marne" in selected_regions and marne_decomposition is not None:
-                if analysis_type == "Hotel Nights":
-                    y_label = 'Hotel Nights (thousands)'
-                    region_name = "Marne"
-                else:
-                    y_label = 'Occupancy Rate (%)'
-                    region_name = "Marne"
+            elif analysis_type == "Hotel Nights":
+                st.info("Hotel Nights data not available for selected regions")
+
+    with tab3:
+        if tab3.open:
+            st.subheader("Marne Hotel Nights Breakdown")
 
-                st.subheader(f"{region_name} - Seasonal Decomposition")
+            # Check if we have datasets for Marne
+            marne_available = (marne_nights_total_processed is not None and
+                              marne_nights_residents_processed is not None and
+                              marne_nights_nonresidents_processed is not None)
 
-                # Original data and trend
+            if marne_available:
+                # Marne chart
                 fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=marne_ts_data.index, y=marne_ts_data.values,
-                    mode='lines', name='Original',
-                    line=dict(color='#1f77b4')
+
+                # Add stacked bars for non-residents (bottom layer - more stable)
+                fig.add_trace(go.Bar(
+                    x=marne_nights_nonresidents_processed['Date'],
+                    y=marne_nights_nonresidents_processed['Hotel_Nights'],
+                    name='Non-Residents',
+                    marker_color='#F18F01',
+                    hovertemplate='<b>Non-Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
+                    width=86400000 * 20  # Bar width in milliseconds (about 20 days)
                 ))
+
+                # Add stacked bars for residents (top layer)
+                fig.add_trace(go.Bar(
+                    x=marne_nights_residents_processed['Date'],
+                    y=marne_nights_residents_processed['Hotel_Nights'],
+                    name='Residents',
+                    marker_color='#A23B72',
+                    hovertemplate='<b>Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
+                    width=86400000 * 20  # Bar width in milliseconds (about 20 days)
+                ))
+
+                # Add total line
                 fig.add_trace(go.Scatter(
-                    x=marne_decomposition.trend.index, y=marne_decomposition.trend.values,
-                    mode='lines', name='Trend',
-                    line=dict(color='red', width=2)
+                    x=marne_nights_total_processed['Date'],
+                    y=marne_nights_total_processed['Hotel_Nights'],
+                    mode='lines',
+                    name='Total',
+                    line=dict(color='#2E86AB', width=3),
+                    hovertemplate='<b>Total</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>'
                 ))
 
-                layout_update = dict(
-                    title=f"Marne: Original Data & Trend ({analysis_type})",
-                    height=320,
+                fig.update_layout(
+                    title="Marne Hotel Nights: Total Line & Stacked Components",
                     xaxis_title="",
-                    yaxis_title=y_label,
-                    margin=dict(t=50, b=30, l=40, r=40)
+                    yaxis_title="Hotel Nights (thousands)",
+                    height=400,
+                    margin=dict(t=60, b=40, l=40, r=40),
+                    barmode='stack',
+                    legend=dict(
+                        yanchor="top",
+                        y=0.99,
+                        xanchor="left",
+                        x=0.01
+                    ),
+                    hovermode='x unified'
                 )
-                if shared_y_range_original is not None:
-                    layout_update['yaxis'] = dict(range=shared_y_range_original)
 
-                fig.update_layout(**layout_update)
                 st.plotly_chart(fig, use_container_width=True)
 
-                # Seasonal component
-                fig_seasonal = px.line(
-                    x=marne_decomposition.seasonal.index,
-                    y=marne_decomposition.seasonal.values,
-                    title="Marne - Seasonal Component"
-                )
-                seasonal_layout = dict(
-                    height=250,
-                    margin=dict(t=40, b=30, l=40, r=40)
-                )
-                if shared_y_range_seasonal is not None:
-                    seasonal_layout['yaxis'] = dict(range=shared_y_range_seasonal)
-
-                fig_seasonal.update_layout(**seasonal_layout)
-                st.plotly_chart(fig_seasonal, use_container_width=True)
-            elif "Marne" in selected_regions:
-                st.info("Seasonal decomposition not available for Marne")
-
-        with col2:
-            if "France" in selected_regions and france_decomposition is not None:
-                if analysis_type == "Hotel Nights":
-                    y_label = 'Hotel Nights (thousands)'
-                    region_name = "France"
-                else:
-                    y_label = 'Occupancy Rate (%)'
-                    region_name = "France"
-
-                st.subheader(f"{region_name} - Seasonal Decomposition")
+                # Marne metrics
+                total_avg = marne_nights_total_processed['Hotel_Nights'].mean()
+                residents_avg = marne_nights_residents_processed['Hotel_Nights'].mean()
+                nonresidents_avg = marne_nights_nonresidents_processed['Hotel_Nights'].mean()
 
-                # Original data and trend
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=france_ts_data.index, y=france_ts_data.values,
-                    mode='lines', name='Original',
-                    line=dict(color='#ff7f0e')
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total Avg", f"{total_avg:,.0f}")
+                with col2:
+                    st.metric("Residents Avg", f"{residents_avg:,.0f}")
+                with col3:
+                    st.metric("Non-Residents Avg", f"{nonresidents_avg:,.0f}")
+
+                # Marne percentage breakdown
+                st.subheader("Residents vs Non-Residents Breakdown")
+
+                breakdown_data = pd.DataFrame({
+                    'Date': marne_nights_total_processed['Date'],
+                    'Residents_Pct': share_of_total(marne_nights_residents_processed, marne_nights_total_processed),
+                    'NonResidents_Pct': share_of_total(marne_nights_nonresidents_processed, marne_nights_total_processed)
+                })
+
+                fig_pct = go.Figure()
+
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['NonResidents_Pct'],
+                    name='Non-Residents %',
+                    marker_color='#F18F01',
+                    hovertemplate='<b>Non-Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
+                    width=86400000 * 20
                 ))
-                fig.add_trace(go.Scatter(
-                    x=france_decomposition.trend.index, y=france_decomposition.trend.values,
-                    mode='lines', name='Trend',
-                    line=dict(color='red', width=2)
+
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['Residents_Pct'],
+                    name='Residents %',
+                    marker_color='#A23B72',
+                    hovertemplate='<b>Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
+                    width=86400000 * 20
                 ))
 
-                layout_update = dict(
-                    title=f"France: Original Data & Trend ({analysis_type})",
-                    height=320,
+                fig_pct.update_layout(
+                    title="Percentage Breakdown: Residents vs Non-Residents",
                     xaxis_title="",
-                    yaxis_title=y_label,
-                    margin=dict(t=50, b=30, l=40, r=40)
+                    yaxis_title="Percentage (%)",
+                    height=300,
+                    margin=dict(t=40, b=40, l=40, r=40),
+                    yaxis=dict(range=[0, 100]),
+                    barmode='stack',
+                    legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
+                    hovermode='x unified'
                 )
-                if shared_y_range_original is not None:
-                    layout_update['yaxis'] = dict(range=shared_y_range_original)
-
-                fig.update_layout(**layout_update)
-                st.plotly_chart(fig, use_container_width=True)
-
-                # Seasonal component
-                fig_seasonal = px.line(
-                    x=france_decomposition.seasonal.index,
-                    y=france_decomposition.seasonal.values,
-                    title="France - Seasonal Component"
-                )
-                seasonal_layout = dict(
-                    height=250,
-                    margin=dict(t=40, b=30, l=40, r=40)
-                )
-                if shared_y_range_seasonal is not None:
-                    seasonal_layout['yaxis'] = dict(range=shared_y_range_seasonal)
-
-                fig_seasonal.update_layout(**seasonal_layout)
-                st.plotly_chart(fig_seasonal, use_container_width=True)
-            elif "France" in selected_regions:
-                st.info("Seasonal decomposition not available for France")
-
-    with tab2:
-        st.subheader(f"Monthly Patterns Across Years - {analysis_type}")
-
-        # Create monthly analysis based on selected type
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-
-        if analysis_type == "Hotel Nights":
-            # Use hotel nights data for both regions
-            if ((marne_nights_total_processed is not None and "Marne" in selected_regions) or
-                (france_nights_total_processed is not None and "France" in selected_regions)):
-
-                # If both regions are selected, create side-by-side charts
-                if ("Marne" in selected_regions and marne_nights_total_processed is not None and
-                    "France" in selected_regions and france_nights_total_processed is not None):
-
-                    col1, col2 = st.columns(2)
-
-                    with col1:
-                        # Marne analysis
-                        marne_analysis = marne_nights_total_processed.copy()
-                        marne_analysis['Month'] = marne_analysis['Date'].dt.month
-                        marne_analysis['Year'] = marne_analysis['Date'].dt.year
-                        monthly_marne = marne_analysis.groupby(['Month', 'Year'])['Hotel_Nights'].mean().reset_index()
-
-                        fig = go.Figure()
-                        for month in range(1, 13):
-                            month_data = monthly_marne[monthly_marne['Month'] == month]['Hotel_Nights']
-                            if len(month_data) > 0:
-                                fig.add_trace(go.Box(
-                                    y=month_data,
-                                    name=months[month-1],
-                                    boxmean=True,
-                                    marker_color='#1f77b4',
-                                    showlegend=False
-                                ))
-
-                        fig.update_layout(
-                            title="Marne - Monthly Hotel Nights Distribution",
-                            xaxis_title="",
-                            yaxis_title="Hotel Nights (thousands)",
-                            height=320,
-                            margin=dict(t=50, b=40, l=40, r=40)
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-
-                    with col2:
-                        # France analysis
-                        france_analysis = france_nights_total_processed.copy()
-                        france_analysis['Month'] = france_analysis['Date'].dt.month
-                        france_analysis['Year'] = france_analysis['Date'].dt.year
-                        monthly_france = france_analysis.groupby(['Month', 'Year'])['Hotel_Nights'].mean().reset_index()
-
-                        fig2 = go.Figure()
-                        for month in range(1, 13):
-                            month_data = monthly_france[monthly_france['Month'] == month]['Hotel_Nights']
-                            if len(month_data) > 0:
-                                fig2.add_trace(go.Box(
-                                    y=month_data,
-                                    name=months[month-1],
-                                    boxmean=True,
-                                    marker_color='#ff7f0e',
-                                    showlegend=False
-                                ))
-
-                        fig2.update_layout(
-                            title="France - Monthly Hotel Nights Distribution",
-                            xaxis_title="",
-                            yaxis_title="Hotel Nights (thousands)",
-                            height=320,
-                            margin=dict(t=50, b=40, l=40, r=40)
-                        )
-                        st.plotly_chart(fig2, use_container_width=True)
-
-                elif "Marne" in selected_regions and marne_nights_total_processed is not None:
-                    # Only Marne
-                    marne_analysis = marne_nights_total_processed.copy()
-                    marne_analysis['Month'] = marne_analysis['Date'].dt.month
-                    marne_analysis['Year'] = marne_analysis['Date'].dt.year
-                    monthly_data = marne_analysis.groupby(['Month', 'Year'])['Hotel_Nights'].mean().reset_index()
-
-                    fig = go.Figure()
-                    for month in range(1, 13):
-                        month_data = monthly_data[monthly_data['Month'] == month]['Hotel_Nights']
-                        if len(month_data) > 0:
-                            fig.add_trace(go.Box(
-                                y=month_data,
-                                name=months[month-1],
-                                boxmean=True,
-                                marker_color='#1f77b4',
-                                showlegend=False
-                            ))
 
-                    fig.update_layout(
-                        title="Marne - Monthly Hotel Nights Distribution",
-                        xaxis_title="",
-                        yaxis_title="Hotel Nights (thousands)",
-                        height=320,
-                        margin=dict(t=50, b=40, l=40, r=40)
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig_pct, use_container_width=True)
 
-                elif "France" in selected_regions and france_nights_total_processed is not None:
-                    # Only France
-                    france_analysis = france_nights_total_processed.copy()
-                    france_analysis['Month'] = france_analysis['Date'].dt.month
-                    france_analysis['Year'] = france_analysis['Date'].dt.year
-                    monthly_data = france_analysis.groupby(['Month', 'Year'])['Hotel_Nights'].mean().reset_index()
+                # Summary metrics for breakdown
+                residents_pct_avg = breakdown_data['Residents_Pct'].mean()
+                nonresidents_pct_avg = breakdown_data['NonResidents_Pct'].mean()
 
-                    fig = go.Figure()
-                    for month in range(1, 13):
-                        month_data = monthly_data[monthly_data['Month'] == month]['Hotel_Nights']
-                        if len(month_data) > 0:
-                            fig.add_trace(go.Box(
-                                y=month_data,
-                                name=months[month-1],
-                                boxmean=True,
-                                marker_color='#ff7f0e',
-                                showlegend=False
-                            ))
-
-                    fig.update_layout(
-                        title="France - Monthly Hotel Nights Distribution",
-                        xaxis_title="",
-                        yaxis_title="Hotel Nights (thousands)",
-                        height=320,
-                        margin=dict(t=50, b=40, l=40, r=40)
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Residents Share", f"{residents_pct_avg:.1f}%")
+                with col2:
+                    st.metric("Non-Residents Share", f"{nonresidents_pct_avg:.1f}%")
             else:
-                st.info("Hotel Nights data not available for selected regions")
-
-        else:
-            # Use occupancy rate data
-            if ((marne_processed is not None and "Marne" in selected_regions) or
-                (france_processed is not None and "France" in selected_regions)):
-
-                fig = go.Figure()
-
-                if "Marne" in selected_regions and marne_processed is not None:
-                    # Add month and year columns for analysis
-                    marne_analysis = marne_processed.copy()
-                    marne_analysis['Month'] = marne_analysis['Date'].dt.month
-                    marne_analysis['Year'] = marne_analysis['Date'].dt.year
-
-                    # Group by month and get all years
-                    monthly_marne = marne_analysis.groupby(['Month', 'Year'])['Occupancy_Rate'].mean().reset_index()
-
-                    for month in range(1, 13):
-                        month_data = monthly_marne[monthly_marne['Month'] == month]['Occupancy_Rate']
-                        if len(month_data) > 0:
-                            fig.add_trace(go.Box(
-                                y=month_data,
-                                name=months[month-1],
-                                boxmean=True,
-                                marker_color='#1f77b4',
-                                showlegend=False
-                            ))
-
-                if "France" in selected_regions and france_processed is not None:
-                    # Add month and year columns for analysis
-                    france_analysis = france_processed.copy()
-                    france_analysis['Month'] = france_analysis['Date'].dt.month
-                    france_analysis['Year'] = france_analysis['Date'].dt.year
-
-                    # Group by month
-                    monthly_france = france_analysis.groupby(['Month', 'Year'])['Occupancy_Rate'].mean().reset_index()
-
-                    # If we have both datasets, create separate box plots
-                    if "Marne" in selected_regions and marne_processed is not None:
-                        fig2 = go.Figure()
-                        for month in range(1, 13):
-                            month_data = monthly_france[monthly_france['Month'] == month]['Occupancy_Rate']
-                            if len(month_data) > 0:
-                                fig2.add_trace(go.Box(
-                                    y=month_data,
-                                    name=months[month-1],
-                                    boxmean=True,
-                                    marker_color='#ff7f0e',
-                                    showlegend=False
-                                ))
-
-                        # Calculate shared y-axis range for monthly patterns
-                        marne_monthly_min = monthly_marne['Occupancy_Rate'].min()
-                        marne_monthly_max = monthly_marne['Occupancy_Rate'].max()
-                        france_monthly_min = monthly_france['Occupancy_Rate'].min()
-                        france_monthly_max = monthly_france['Occupancy_Rate'].max()
-                        combined_min = min(marne_monthly_min, france_monthly_min)
-                        combined_max = max(marne_monthly_max, france_monthly_max)
-                        y_range = [combined_min - 2, combined_max + 2]
-
-                        fig.update_layout(
-                            title="Marne - Monthly Occupancy Distribution",
-                            xaxis_title="",
-                            yaxis_title="Occupancy Rate (%)",
-                            height=320,
-                            margin=dict(t=50, b=40, l=40, r=40),
-                            yaxis=dict(range=y_range)
-                        )
-
-                        fig2.update_layout(
-                            title="France - Monthly Occupancy Distribution",
-                            xaxis_title="",
-                            yaxis_title="Occupancy Rate (%)",
-                            height=320,
-                            margin=dict(t=50, b=40, l=40, r=40),
-                            yaxis=dict(range=y_range)
-                        )
-
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.plotly_chart(fig, use_container_width=True)
-
-                        with col2:
-                            st.plotly_chart(fig2, use_container_width=True)
-                    else:
-                        # Only France data
-                        for month in range(1, 13):
-                            month_data = monthly_france[monthly_france['Month'] == month]['Occupancy_Rate']
-                            if len(month_data) > 0:
-                                fig.add_trace(go.Box(
-                                    y=month_data,
-                                    name=months[month-1],
-                                    boxmean=True,
-                                    marker_color='#ff7f0e',
-                                    showlegend=False
-                                ))
-
-                        fig.update_layout(
-                            title="France - Monthly Occupancy Distribution",
-                            xaxis_title="",
-                            yaxis_title="Occupancy Rate (%)",
-                            height=320,
-                            margin=dict(t=50, b=40, l=40, r=40)
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                else:
-                    # Only Marne data
-                    fig.update_layout(
-                        title="Marne - Monthly Occupancy Distribution",
-                        xaxis_title="",
-                        yaxis_title="Occupancy Rate (%)",
-                        height=320,
-                        margin=dict(t=50, b=40, l=40, r=40)
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-
-    with tab3:
-        st.subheader("Marne Hotel Nights Breakdown")
+                st.error("Marne hotel nights data not available or missing required datasets")
 
-        # Check if we have datasets for Marne
-        marne_available = (marne_nights_total_processed is not None and
-                          marne_nights_residents_processed is not None and
-                          marne_nights_nonresidents_processed is not None)
+    with tab4:
+        if tab4.open:
+            st.subheader("France Hotel Nights Breakdown")
 
-        if marne_available:
-            # Marne chart
-            fig = go.Figure()
+            # Check if we have datasets for France
+            france_available = (france_nights_total_processed is not None and
+                               france_nights_residents_processed is not None and
+                               france_nights_nonresidents_processed is not None)
 
-            # Add stacked bars for non-residents (bottom layer - more stable)
-            fig.add_trace(go.Bar(
-                x=marne_nights_nonresidents_processed['Date'],
-                y=marne_nights_nonresidents_processed['Hotel_Nights'],
-                name='Non-Residents',
-                marker_color='#F18F01',
-                hovertemplate='<b>Non-Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
-                width=86400000 * 20  # Bar width in milliseconds (about 20 days)
-            ))
-
-            # Add stacked bars for residents (top layer)
-            fig.add_trace(go.Bar(
-                x=marne_nights_residents_processed['Date'],
-                y=marne_nights_residents_processed['Hotel_Nights'],
-                name='Residents',
-                marker_color='#A23B72',
-                hovertemplate='<b>Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
-                width=86400000 * 20  # Bar width in milliseconds (about 20 days)
-            ))
-
-            # Add total line
-            fig.add_trace(go.Scatter(
-                x=marne_nights_total_processed['Date'],
-                y=marne_nights_total_processed['Hotel_Nights'],
-                mode='lines',
-                name='Total',
-                line=dict(color='#2E86AB', width=3),
-                hovertemplate='<b>Total</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>'
-            ))
+            if france_available:
+                # France chart
+                fig = go.Figure()
 
-            fig.update_layout(
-                title="Marne Hotel Nights: Total Line & Stacked Components",
-                xaxis_title="",
-                yaxis_title="Hotel Nights (thousands)",
-                height=400,
-                margin=dict(t=60, b=40, l=40, r=40),
-                barmode='stack',
-                legend=dict(
-                    yanchor="top",
-                    y=0.99,
-                    xanchor="left",
-                    x=0.01
-                ),
-                hovermode='x unified'
-            )
+                # Add stacked bars for non-residents (bottom layer - more stable)
+                fig.add_trace(go.Bar(
+                    x=france_nights_nonresidents_processed['Date'],
+                    y=france_nights_nonresidents_processed['Hotel_Nights'],
+                    name='Non-Residents',
+                    marker_color='#F18F01',
+                    hovertemplate='<b>Non-Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
+                    width=86400000 * 20  # Bar width in milliseconds (about 20 days)
+                ))
 
-            st.plotly_chart(fig, use_container_width=True)
+                # Add stacked bars for residents (top layer)
+                fig.add_trace(go.Bar(
+                    x=france_nights_residents_processed['Date'],
+                    y=france_nights_residents_processed['Hotel_Nights'],
+                    name='Residents',
+                    marker_color='#A23B72',
+                    hovertemplate='<b>Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
+                    width=86400000 * 20  # Bar width in milliseconds (about 20 days)
+                ))
 
-            # Marne metrics
-            total_avg = marne_nights_total_processed['Hotel_Nights'].mean()
-            residents_avg = marne_nights_residents_processed['Hotel_Nights'].mean()
-            nonresidents_avg = marne_nights_nonresidents_processed['Hotel_Nights'].mean()
+                # Add total line
+                fig.add_trace(go.Scatter(
+                    x=france_nights_total_processed['Date'],
+                    y=france_nights_total_processed['Hotel_Nights'],
+                    mode='lines',
+                    name='Total',
+                    line=dict(color='#2E86AB', width=3),
+                    hovertemplate='<b>Total</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>'
+                ))
 
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Avg", f"{total_avg:,.0f}")
-            with col2:
-                st.metric("Residents Avg", f"{residents_avg:,.0f}")
-            with col3:
-                st.metric("Non-Residents Avg", f"{nonresidents_avg:,.0f}")
-
-            # Marne percentage breakdown
-            st.subheader("Residents vs Non-Residents Breakdown")
-
-            breakdown_data = pd.DataFrame({
-                'Date': marne_nights_total_processed['Date'],
-                'Residents_Pct': (marne_nights_residents_processed['Hotel_Nights'] /
-                                 marne_nights_total_processed['Hotel_Nights'] * 100),
-                'NonResidents_Pct': (marne_nights_nonresidents_processed['Hotel_Nights'] /
-                                    marne_nights_total_processed['Hotel_Nights'] * 100)
-            })
-
-            fig_pct = go.Figure()
-
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['NonResidents_Pct'],
-                name='Non-Residents %',
-                marker_color='#F18F01',
-                hovertemplate='<b>Non-Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
-                width=86400000 * 20
-            ))
-
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['Residents_Pct'],
-                name='Residents %',
-                marker_color='#A23B72',
-                hovertemplate='<b>Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
-                width=86400000 * 20
-            ))
-
-            fig_pct.update_layout(
-                title="Percentage Breakdown: Residents vs Non-Residents",
-                xaxis_title="",
-                yaxis_title="Percentage (%)",
-                height=300,
-                margin=dict(t=40, b=40, l=40, r=40),
-                yaxis=dict(range=[0, 100]),
-                barmode='stack',
-                legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
-                hovermode='x unified'
-            )
+                fig.update_layout(
+                    title="France Hotel Nights: Total Line & Stacked Components",
+                    xaxis_title="",
+                    yaxis_title="Hotel Nights (thousands)",
+                    height=400,
+                    margin=dict(t=60, b=40, l=40, r=40),
+                    barmode='stack',
+                    legend=dict(
+                        yanchor="top",
+                        y=0.99,
+                        xanchor="left",
+                        x=0.01
+                    ),
+                    hovermode='x unified'
+                )
 
-            st.plotly_chart(fig_pct, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True)
 
-            # Summary metrics for breakdown
-            residents_pct_avg = breakdown_data['Residents_Pct'].mean()
-            nonresidents_pct_avg = breakdown_data['NonResidents_Pct'].mean()
+                # France metrics
+                total_avg = france_nights_total_processed['Hotel_Nights'].mean()
+                residents_avg = france_nights_residents_processed['Hotel_Nights'].mean()
+                nonresidents_avg = france_nights_nonresidents_processed['Hotel_Nights'].mean()
 
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Residents Share", f"{residents_pct_avg:.1f}%")
-            with col2:
-                st.metric("Non-Residents Share", f"{nonresidents_pct_avg:.1f}%")
-        else:
-            st.error("Marne hotel nights data not available or missing required datasets")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total Avg", f"{total_avg:,.0f}")
+                with col2:
+                    st.metric("Residents Avg", f"{residents_avg:,.0f}")
+                with col3:
+                    st.metric("Non-Residents Avg", f"{nonresidents_avg:,.0f}")
+
+                # France percentage breakdown
+                st.subheader("Residents vs Non-Residents Breakdown")
+
+                breakdown_data = pd.DataFrame({
+                    'Date': france_nights_total_processed['Date'],
+                    'Residents_Pct': share_of_total(france_nights_residents_processed, france_nights_total_processed),
+                    'NonResidents_Pct': share_of_total(france_nights_nonresidents_processed, france_nights_total_processed)
+                })
+
+                fig_pct = go.Figure()
+
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['NonResidents_Pct'],
+                    name='Non-Residents %',
+                    marker_color='#F18F01',
+                    hovertemplate='<b>Non-Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
+                    width=86400000 * 20
+                ))
 
-    with tab4:
-        st.subheader("France Hotel Nights Breakdown")
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['Residents_Pct'],
+                    name='Residents %',
+                    marker_color='#A23B72',
+                    hovertemplate='<b>Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
+                    width=86400000 * 20
+                ))
 
-        # Check if we have datasets for France
-        france_available = (france_nights_total_processed is not None and
-                           france_nights_residents_processed is not None and
-                           france_nights_nonresidents_processed is not None)
+                fig_pct.update_layout(
+                    title="Percentage Breakdown: Residents vs Non-Residents",
+                    xaxis_title="",
+                    yaxis_title="Percentage (%)",
+                    height=300,
+                    margin=dict(t=40, b=40, l=40, r=40),
+                    yaxis=dict(range=[0, 100]),
+                    barmode='stack',
+                    legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
+                    hovermode='x unified'
+                )
 
-        if france_available:
-            # France chart
-            fig = go.Figure()
+                st.plotly_chart(fig_pct, use_container_width=True)
 
-            # Add stacked bars for non-residents (bottom layer - more stable)
-            fig.add_trace(go.Bar(
-                x=france_nights_nonresidents_processed['Date'],
-                y=france_nights_nonresidents_processed['Hotel_Nights'],
-                name='Non-Residents',
-                marker_color='#F18F01',
-                hovertemplate='<b>Non-Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
-                width=86400000 * 20  # Bar width in milliseconds (about 20 days)
-            ))
-
-            # Add stacked bars for residents (top layer)
-            fig.add_trace(go.Bar(
-                x=france_nights_residents_processed['Date'],
-                y=france_nights_residents_processed['Hotel_Nights'],
-                name='Residents',
-                marker_color='#A23B72',
-                hovertemplate='<b>Residents</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>',
-                width=86400000 * 20  # Bar width in milliseconds (about 20 days)
-            ))
-
-            # Add total line
-            fig.add_trace(go.Scatter(
-                x=france_nights_total_processed['Date'],
-                y=france_nights_total_processed['Hotel_Nights'],
-                mode='lines',
-                name='Total',
-                line=dict(color='#2E86AB', width=3),
-                hovertemplate='<b>Total</b><br>%{y:,.0f} nights<br>%{x}<extra></extra>'
-            ))
+                # Summary metrics for breakdown
+                residents_pct_avg = breakdown_data['Residents_Pct'].mean()
+                nonresidents_pct_avg = breakdown_data['NonResidents_Pct'].mean()
 
-            fig.update_layout(
-                title="France Hotel Nights: Total Line & Stacked Components",
-                xaxis_title="",
-                yaxis_title="Hotel Nights (thousands)",
-                height=400,
-                margin=dict(t=60, b=40, l=40, r=40),
-                barmode='stack',
-                legend=dict(
-                    yanchor="top",
-                    y=0.99,
-                    xanchor="left",
-                    x=0.01
-                ),
-                hovermode='x unified'
-            )
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Residents Share", f"{residents_pct_avg:.1f}%")
+                with col2:
+                    st.metric("Non-Residents Share", f"{nonresidents_pct_avg:.1f}%")
+            else:
+                st.error("France hotel nights data not available or missing required datasets")
 
-            st.plotly_chart(fig, use_container_width=True)
+    with tab5:
+        if tab5.open:
+            st.subheader("Grand Est Hotel Nights by Rating (Annual Data)")
+
+            # Check if we have all Grand Est rating datasets
+            grand_est_rating_available = (grand_est_nights_total_processed is not None and
+                                          grand_est_nights_1_2_stars_processed is not None and
+                                          grand_est_nights_3_stars_processed is not None and
+                                          grand_est_nights_4_5_stars_processed is not None and
+                                          grand_est_nights_non_rated_processed is not None)
+
+            if grand_est_rating_available:
+                # Create stacked bar chart with rating breakdown
+                fig = go.Figure()
 
-            # France metrics
-            total_avg = france_nights_total_processed['Hotel_Nights'].mean()
-            residents_avg = france_nights_residents_processed['Hotel_Nights'].mean()
-            nonresidents_avg = france_nights_nonresidents_processed['Hotel_Nights'].mean()
+                # Add stacked bars for each rating category
+                # Non-rated (bottom)
+                fig.add_trace(go.Bar(
+                    x=grand_est_nights_non_rated_processed['Date'],
+                    y=grand_est_nights_non_rated_processed['Hotel_Nights'],
+                    name='Non-Rated',
+                    marker_color='#CCCCCC',
+                    hovertemplate='<b>Non-Rated</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200  # Wider bars for annual data
+                ))
 
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Avg", f"{total_avg:,.0f}")
-            with col2:
-                st.metric("Residents Avg", f"{residents_avg:,.0f}")
-            with col3:
-                st.metric("Non-Residents Avg", f"{nonresidents_avg:,.0f}")
-
-            # France percentage breakdown
-            st.subheader("Residents vs Non-Residents Breakdown")
-
-            breakdown_data = pd.DataFrame({
-                'Date': france_nights_total_processed['Date'],
-                'Residents_Pct': (france_nights_residents_processed['Hotel_Nights'] /
-                                 france_nights_total_processed['Hotel_Nights'] * 100),
-                'NonResidents_Pct': (france_nights_nonresidents_processed['Hotel_Nights'] /
-                                    france_nights_total_processed['Hotel_Nights'] * 100)
-            })
-
-            fig_pct = go.Figure()
-
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['NonResidents_Pct'],
-                name='Non-Residents %',
-                marker_color='#F18F01',
-                hovertemplate='<b>Non-Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
-                width=86400000 * 20
-            ))
-
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['Residents_Pct'],
-                name='Residents %',
-                marker_color='#A23B72',
-                hovertemplate='<b>Residents</b><br>%{y:.1f}%<br>%{x}<extra></extra>',
-                width=86400000 * 20
-            ))
-
-            fig_pct.update_layout(
-                title="Percentage Breakdown: Residents vs Non-Residents",
-                xaxis_title="",
-                yaxis_title="Percentage (%)",
-                height=300,
-                margin=dict(t=40, b=40, l=40, r=40),
-                yaxis=dict(range=[0, 100]),
-                barmode='stack',
-                legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
-                hovermode='x unified'
-            )
+                # 1-2 Stars
+                fig.add_trace(go.Bar(
+                    x=grand_est_nights_1_2_stars_processed['Date'],
+                    y=grand_est_nights_1_2_stars_processed['Hotel_Nights'],
+                    name='1-2 Stars',
+                    marker_color='#FFB84D',
+                    hovertemplate='<b>1-2 Stars</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200
+                ))
 
-            st.plotly_chart(fig_pct, use_container_width=True)
+                # 3 Stars
+                fig.add_trace(go.Bar(
+                    x=grand_est_nights_3_stars_processed['Date'],
+                    y=grand_est_nights_3_stars_processed['Hotel_Nights'],
+                    name='3 Stars',
+                    marker_color='#4CAF50',
+                    hovertemplate='<b>3 Stars</b><br>%{y:.1f} nights<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200
+                ))
 
-            # Summary metrics for breakdown
-            residents_pct_avg = breakdown_data['Residents_Pct'].mean()
-            nonresidents_pct_avg = breakdown_data['NonResidents_Pct'].mean()
+                # 4-5 Stars (top)
+                fig.add_trace(go.Bar(
+                    x=grand_est_nights_4_5_stars_processed['Date'],
+                    y=grand_est_nights_4_5_stars_processed['Hotel_Nights'],
+                    name='4-5 Stars',
+                    marker_color='#9C27B0',
+                    hovertemplate='<b>4-5 Stars</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200
+                ))
 
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Residents Share", f"{residents_pct_avg:.1f}%")
-            with col2:
-                st.metric("Non-Residents Share", f"{nonresidents_pct_avg:.1f}%")
-        else:
-            st.error("France hotel nights data not available or missing required datasets")
+                # Add total line
+                fig.add_trace(go.Scatter(
+                    x=grand_est_nights_total_processed['Date'],
+                    y=grand_est_nights_total_processed['Hotel_Nights'],
+                    mode='lines+markers',
+                    name='Total',
+                    line=dict(color='#2E86AB', width=3),
+                    marker=dict(size=8),
+                    hovertemplate='<b>Total</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>'
+                ))
 
-    with tab5:
-        st.subheader("Grand Est Hotel Nights by Rating (Annual Data)")
+                fig.update_layout(
+                    title="Grand Est Hotel Nights by Rating: Total Line & Stacked Components",
+                    xaxis_title="",
+                    yaxis_title="Hotel Nights (thousands)",
+                    height=450,
+                    margin=dict(t=60, b=40, l=40, r=40),
+                    barmode='stack',
+                    legend=dict(
+                        yanchor="top",
+                        y=0.99,
+                        xanchor="left",
+                        x=0.01
+                    ),
+                    hovermode='x unified'
+                )
 
-        # Check if we have all Grand Est rating datasets
-        grand_est_rating_available = (grand_est_nights_total_processed is not None and
-                                      grand_est_nights_1_2_stars_processed is not None and
-                                      grand_est_nights_3_stars_processed is not None and
-                                      grand_est_nights_4_5_stars_processed is not None and
-                                      grand_est_nights_non_rated_processed is not None)
+                st.plotly_chart(fig, use_container_width=True)
 
-        if grand_est_rating_available:
-            # Create stacked bar chart with rating breakdown
-            fig = go.Figure()
+                # Metrics
+                total_avg = grand_est_nights_total_processed['Hotel_Nights'].mean()
+                stars_1_2_avg = grand_est_nights_1_2_stars_processed['Hotel_Nights'].mean()
+                stars_3_avg = grand_est_nights_3_stars_processed['Hotel_Nights'].mean()
+                stars_4_5_avg = grand_est_nights_4_5_stars_processed['Hotel_Nights'].mean()
+                non_rated_avg = grand_est_nights_non_rated_processed['Hotel_Nights'].mean()
 
-            # Add stacked bars for each rating category
-            # Non-rated (bottom)
-            fig.add_trace(go.Bar(
-                x=grand_est_nights_non_rated_processed['Date'],
-                y=grand_est_nights_non_rated_processed['Hotel_Nights'],
-                name='Non-Rated',
-                marker_color='#CCCCCC',
-                hovertemplate='<b>Non-Rated</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200  # Wider bars for annual data
-            ))
-
-            # 1-2 Stars
-            fig.add_trace(go.Bar(
-                x=grand_est_nights_1_2_stars_processed['Date'],
-                y=grand_est_nights_1_2_stars_processed['Hotel_Nights'],
-                name='1-2 Stars',
-                marker_color='#FFB84D',
-                hovertemplate='<b>1-2 Stars</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200
-            ))
-
-            # 3 Stars
-            fig.add_trace(go.Bar(
-                x=grand_est_nights_3_stars_processed['Date'],
-                y=grand_est_nights_3_stars_processed['Hotel_Nights'],
-                name='3 Stars',
-                marker_color='#4CAF50',
-                hovertemplate='<b>3 Stars</b><br>%{y:.1f} nights<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200
-            ))
-
-            # 4-5 Stars (top)
-            fig.add_trace(go.Bar(
-                x=grand_est_nights_4_5_stars_processed['Date'],
-                y=grand_est_nights_4_5_stars_processed['Hotel_Nights'],
-                name='4-5 Stars',
-                marker_color='#9C27B0',
-                hovertemplate='<b>4-5 Stars</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200
-            ))
-
-            # Add total line
-            fig.add_trace(go.Scatter(
-                x=grand_est_nights_total_processed['Date'],
-                y=grand_est_nights_total_processed['Hotel_Nights'],
-                mode='lines+markers',
-                name='Total',
-                line=dict(color='#2E86AB', width=3),
-                marker=dict(size=8),
-                hovertemplate='<b>Total</b><br>%{y:,.0f} nights<br>%{x|%Y}<extra></extra>'
-            ))
+                col1, col2, col3, col4, col5 = st.columns(5)
+                with col1:
+                    st.metric("Total Avg", f"{total_avg:,.0f}")
+                with col2:
+                    st.metric("1-2★ Avg", f"{stars_1_2_avg:,.0f}")
+                with col3:
+                    st.metric("3★ Avg", f"{stars_3_avg:,.0f}")
+                with col4:
+                    st.metric("4-5★ Avg", f"{stars_4_5_avg:,.0f}")
+                with col5:
+                    st.metric("Non-Rated Avg", f"{non_rated_avg:,.0f}")
+
+                # Percentage breakdown
+                st.subheader("Rating Distribution Over Time")
+
+                breakdown_data = pd.DataFrame({
+                    'Date': grand_est_nights_total_processed['Date'],
+                    'NonRated_Pct': share_of_total(grand_est_nights_non_rated_processed, grand_est_nights_total_processed),
+                    'Stars_1_2_Pct': share_of_total(grand_est_nights_1_2_stars_processed, grand_est_nights_total_processed),
+                    'Stars_3_Pct': share_of_total(grand_est_nights_3_stars_processed, grand_est_nights_total_processed),
+                    'Stars_4_5_Pct': share_of_total(grand_est_nights_4_5_stars_processed, grand_est_nights_total_processed)
+                })
+
+                fig_pct = go.Figure()
+
+                # Stacked percentage bars
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['NonRated_Pct'],
+                    name='Non-Rated %',
+                    marker_color='#CCCCCC',
+                    hovertemplate='<b>Non-Rated</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200
+                ))
 
-            fig.update_layout(
-                title="Grand Est Hotel Nights by Rating: Total Line & Stacked Components",
-                xaxis_title="",
-                yaxis_title="Hotel Nights (thousands)",
-                height=450,
-                margin=dict(t=60, b=40, l=40, r=40),
-                barmode='stack',
-                legend=dict(
-                    yanchor="top",
-                    y=0.99,
-                    xanchor="left",
-                    x=0.01
-                ),
-                hovermode='x unified'
-            )
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['Stars_1_2_Pct'],
+                    name='1-2 Stars %',
+                    marker_color='#FFB84D',
+                    hovertemplate='<b>1-2 Stars</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200
+                ))
 
-            st.plotly_chart(fig, use_container_width=True)
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['Stars_3_Pct'],
+                    name='3 Stars %',
+                    marker_color='#4CAF50',
+                    hovertemplate='<b>3 Stars</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200
+                ))
 
-            # Metrics
-            total_avg = grand_est_nights_total_processed['Hotel_Nights'].mean()
-            stars_1_2_avg = grand_est_nights_1_2_stars_processed['Hotel_Nights'].mean()
-            stars_3_avg = grand_est_nights_3_stars_processed['Hotel_Nights'].mean()
-            stars_4_5_avg = grand_est_nights_4_5_stars_processed['Hotel_Nights'].mean()
-            non_rated_avg = grand_est_nights_non_rated_processed['Hotel_Nights'].mean()
+                fig_pct.add_trace(go.Bar(
+                    x=breakdown_data['Date'],
+                    y=breakdown_data['Stars_4_5_Pct'],
+                    name='4-5 Stars %',
+                    marker_color='#9C27B0',
+                    hovertemplate='<b>4-5 Stars</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
+                    width=86400000 * 200
+                ))
 
-            col1, col2, col3, col4, col5 = st.columns(5)
-            with col1:
-                st.metric("Total Avg", f"{total_avg:,.0f}")
-            with col2:
-                st.metric("1-2★ Avg", f"{stars_1_2_avg:,.0f}")
-            with col3:
-                st.metric("3★ Avg", f"{stars_3_avg:,.0f}")
-            with col4:
-                st.metric("4-5★ Avg", f"{stars_4_5_avg:,.0f}")
-            with col5:
-                st.metric("Non-Rated Avg", f"{non_rated_avg:,.0f}")
-
-            # Percentage breakdown
-            st.subheader("Rating Distribution Over Time")
-
-            breakdown_data = pd.DataFrame({
-                'Date': grand_est_nights_total_processed['Date'],
-                'NonRated_Pct': (grand_est_nights_non_rated_processed['Hotel_Nights'] /
-                                grand_est_nights_total_processed['Hotel_Nights'] * 100),
-                'Stars_1_2_Pct': (grand_est_nights_1_2_stars_processed['Hotel_Nights'] /
-                                 grand_est_nights_total_processed['Hotel_Nights'] * 100),
-                'Stars_3_Pct': (grand_est_nights_3_stars_processed['Hotel_Nights'] /
-                               grand_est_nights_total_processed['Hotel_Nights'] * 100),
-                'Stars_4_5_Pct': (grand_est_nights_4_5_stars_processed['Hotel_Nights'] /
-                                 grand_est_nights_total_processed['Hotel_Nights'] * 100)
-            })
-
-            fig_pct = go.Figure()
-
-            # Stacked percentage bars
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['NonRated_Pct'],
-                name='Non-Rated %',
-                marker_color='#CCCCCC',
-                hovertemplate='<b>Non-Rated</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200
-            ))
-
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['Stars_1_2_Pct'],
-                name='1-2 Stars %',
-                marker_color='#FFB84D',
-                hovertemplate='<b>1-2 Stars</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200
-            ))
-
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['Stars_3_Pct'],
-                name='3 Stars %',
-                marker_color='#4CAF50',
-                hovertemplate='<b>3 Stars</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200
-            ))
-
-            fig_pct.add_trace(go.Bar(
-                x=breakdown_data['Date'],
-                y=breakdown_data['Stars_4_5_Pct'],
-                name='4-5 Stars %',
-                marker_color='#9C27B0',
-                hovertemplate='<b>4-5 Stars</b><br>%{y:.1f}%<br>%{x|%Y}<extra></extra>',
-                width=86400000 * 200
-            ))
-
-            fig_pct.update_layout(
-                title="Percentage Distribution by Rating",
-                xaxis_title="",
-                yaxis_title="Percentage (%)",
-                height=350,
-                margin=dict(t=40, b=40, l=40, r=40),
-                yaxis=dict(range=[0, 100]),
-                barmode='stack',
-                legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
-                hovermode='x unified'
-            )
+                fig_pct.update_layout(
+                    title="Percentage Distribution by Rating",
+                    xaxis_title="",
+                    yaxis_title="Percentage (%)",
+                    height=350,
+                    margin=dict(t=40, b=40, l=40, r=40),
+                    yaxis=dict(range=[0, 100]),
+                    barmode='stack',
+                    legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
+                    hovermode='x unified'
+                )
 
-            st.plotly_chart(fig_pct, use_container_width=True)
+                st.plotly_chart(fig_pct, use_container_width=True)
 
-            # Average percentage shares
-            non_rated_pct_avg = breakdown_data['NonRated_Pct'].mean()
-            stars_1_2_pct_avg = breakdown_data['Stars_1_2_Pct'].mean()
-            stars_3_pct_avg = breakdown_data['Stars_3_Pct'].mean()
-            stars_4_5_pct_avg = breakdown_data['Stars_4_5_Pct'].mean()
+                # Average percentage shares
+                non_rated_pct_avg = breakdown_data['NonRated_Pct'].mean()
+                stars_1_2_pct_avg = breakdown_data['Stars_1_2_Pct'].mean()
+                stars_3_pct_avg = breakdown_data['Stars_3_Pct'].mean()
+                stars_4_5_pct_avg = breakdown_data['Stars_4_5_Pct'].mean()
 
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Non-Rated Share", f"{non_rated_pct_avg:.1f}%")
-            with col2:
-                st.metric("1-2★ Share", f"{stars_1_2_pct_avg:.1f}%")
-            with col3:
-                st.metric("3★ Share", f"{stars_3_pct_avg:.1f}%")
-            with col4:
-                st.metric("4-5★ Share", f"{stars_4_5_pct_avg:.1f}%")
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Non-Rated Share", f"{non_rated_pct_avg:.1f}%")
+                with col2:
+                    st.metric("1-2★ Share", f"{stars_1_2_pct_avg:.1f}%")
+                with col3:
+                    st.metric("3★ Share", f"{stars_3_pct_avg:.1f}%")
+                with col4:
+                    st.metric("4-5★ Share", f"{stars_4_5_pct_avg:.1f}%")
 
-        else:
-            st.info("Grand Est rating breakdown data is not yet available. This data is updated annually by INSEE.")
+            else:
+                st.info("Grand Est rating breakdown data is not yet available. This data is updated annually by INSEE.")
 
     with tab6:
-        st.subheader("Grand Est - Number of Hotels Over Time")
+        if tab6.open:
+            st.subheader("Grand Est - Number of Hotels Over Time")
 
-        if grand_est_hotels_processed is not None:
-            if 'Date' in grand_est_hotels_processed.columns and 'Hotel_Count' in grand_est_hotels_processed.columns:
-                avg_count = grand_est_hotels_processed['Hotel_Count'].mean()
+            if grand_est_hotels_processed is not None:
+                if 'Date' in grand_est_hotels_processed.columns and 'Hotel_Count' in grand_est_hotels_processed.columns:
+                    avg_count = region_stats["Grand Est"][0]
 
-                fig = px.line(grand_est_hotels_processed,
-                             x='Date',
-                             y='Hotel_Count',
-                             title="Grand Est - Number of Hotels Over Time",
-                             color_discrete_sequence=['#2ca02c'])
-
-                # Add horizontal average line
-                fig.add_hline(y=avg_count, line_dash="dash", line_color="red",
-                             annotation_text=f"Avg: {avg_count:.0f} hotels",
-                             annotation_position="top right")
+                    fig = go.Figure()
+                    fig.add_trace(go.Scattergl(
+                        x=grand_est_hotels_processed['Date'],
+                        y=grand_est_hotels_processed['Hotel_Count'],
+                        mode='lines',
+                        name='Hotels',
+                        line=dict(color='#2ca02c'),
+                        hovertemplate='<b>Hotels</b><br>%{y:,.0f}<br>%{x}<extra></extra>'
+                    ))
+
+                    # Add horizontal average line
+                    fig.add_hline(y=avg_count, line_dash="dash", line_color="red",
+                                 annotation_text=f"Avg: {avg_count:.0f} hotels",
+                                 annotation_position="top right")
 
-                fig.update_layout(
-                    height=400,
-                    xaxis_title="",
-                    yaxis_title="Number of Hotels",
-                    margin=dict(t=40, b=40, l=40, r=40)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                    fig.update_layout(
+                        title="Grand Est - Number of Hotels Over Time",
+                        height=400,
+                        xaxis_title="",
+                        yaxis_title="Number of Hotels",
+                        margin=dict(t=40, b=40, l=40, r=40)
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
 
-                # Show trend information
-                recent_count = grand_est_hotels_processed['Hotel_Count'].iloc[-1]
-                initial_count = grand_est_hotels_processed['Hotel_Count'].iloc[0]
-                trend = "📈 Increasing" if recent_count > initial_count else "📉 Decreasing" if recent_count < initial_count else "➡️ Stable"
+                    # Show trend information
+                    recent_count = grand_est_hotels_processed['Hotel_Count'].iloc[-1]
+                    initial_count = grand_est_hotels_processed['Hotel_Count'].iloc[0]
+                    trend = "📈 Increasing" if recent_count > initial_count else "📉 Decreasing" if recent_count < initial_count else "➡️ Stable"
 
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Current Hotels", f"{recent_count:.0f}")
-                with col2:
-                    st.metric("Average", f"{avg_count:.0f}")
-                with col3:
-                    st.metric("Initial Count", f"{initial_count:.0f}")
-                with col4:
-                    st.metric("Trend", trend)
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("Current Hotels", f"{recent_count:.0f}")
+                    with col2:
+                        st.metric("Average", f"{avg_count:.0f}")
+                    with col3:
+                        st.metric("Initial Count", f"{initial_count:.0f}")
+                    with col4:
+                        st.metric("Trend", trend)
 
+                else:
+                    st.error("Required columns (Date, Hotel_Count) not found in Grand Est hotels data")
             else:
-                st.error("Required columns (Date, Hotel_Count) not found in Grand Est hotels data")
-        else:
-            st.error("Grand Est hotels data not available")
+                st.error("Grand Est hotels data not available")
 
     # Add data toggle in sidebar for advanced users
     if st.sidebar.checkbox("Show Raw Data (Advanced)", value=False):
         st.header("📋 Raw Data")
 
-        if "Marne" in selected_regions and marne_processed is not None:
-            st.subheader("Marne Data")
-            # Prepare display dataframe
-            display_df = marne_processed.copy()
-            # Convert date to last day of month
-            display_df['Date'] = pd.to_datetime(display_df['Date']) + pd.offsets.MonthEnd(0)
-            # Format as YYYY-MM-DD
-            display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
-            # Remove Region column if it exists
-            if 'Region' in display_df.columns:
-                display_df = display_df.drop(columns=['Region'])
-            st.dataframe(display_df, width='stretch')
-
-        if "France" in selected_regions and france_processed is not None:
-            st.subheader("France Data")
-            # Prepare display dataframe
-            display_df = france_processed.copy()
-            # Convert date to last day of month
-            display_df['Date'] = pd.to_datetime(display_df['Date']) + pd.offsets.MonthEnd(0)
-            # Format as YYYY-MM-DD
-            display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
-            # Remove Region column if it exists
-            if 'Region' in display_df.columns:
-                display_df = display_df.drop(columns=['Region'])
-            st.dataframe(display_df, width='stretch')
+        for region_name, region_processed in [("Marne", marne_processed), ("France", france_processed)]:
+            if region_name in selected_regions and region_processed is not None:
+                st.subheader(f"{region_name} Data")
+                # Prepare display dataframe with only the displayed columns (no Region)
+                display_df = region_processed[['Date', 'Occupancy_Rate', 'Status']].copy()
+                # Convert date to last day of month
+                display_df['Date'] = pd.to_datetime(display_df['Date']) + pd.offsets.MonthEnd(0)
+                # Format as YYYY-MM-DD
+                display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
+                st.dataframe(display_df, width='stretch', hide_index=True)
 
     # Footer
     st.markdown("---")